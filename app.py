@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
+import time
+import warnings
 
 # --- Configuração da Página ---
 st.set_page_config(page_title="🏭 Dashboard Científico de Produção", layout="wide")
@@ -18,9 +20,105 @@ url_pre = "https://raw.githubusercontent.com/K1NGOD-RJ/Analise-da-Controle/refs/
 url_mod = "https://raw.githubusercontent.com/K1NGOD-RJ/Analise-da-Controle/refs/heads/main/updated_MOD_kpiv1.csv    "
 url_almx = "https://raw.githubusercontent.com/K1NGOD-RJ/Analise-da-Controle/refs/heads/main/updated_ALMX_kpiv1.csv    "
 
+# --- Qualidade dos Dados: regras de validação na ingestão ---
+# Linhas que falham em alguma regra vão para a quarentena (disponível para download) com os códigos de motivo.
+# "rejeitar" remove a linha do dashboard; "alertar" mantém a linha, mas a registra na quarentena.
+ARQUIVO_QUARENTENA = "quarentena_dataframe.csv"
+
+# Faixa aceitável do fator de ponderação (QTD_PONDERADA / QTD), com tolerância de arredondamento em unidades
+FATOR_PONDERACAO_MIN = 0.25
+FATOR_PONDERACAO_MAX = 2.0
+TOLERANCIA_PONDERACAO = 1
+
+def semana_esperada(datas):
+    # Mesmo critério da planilha de origem: semana iniciando no domingo (%U) + 1
+    dia_semana = (datas.dt.dayofweek + 1) % 7
+    return (datas.dt.dayofyear - 1 + 7 - dia_semana) // 7 + 1
+
+def ponderada_fora_faixa(d):
+    minimo = d['QTD'] * FATOR_PONDERACAO_MIN - TOLERANCIA_PONDERACAO
+    maximo = d['QTD'] * FATOR_PONDERACAO_MAX + TOLERANCIA_PONDERACAO
+    return d['QTD'].notna() & d['QTD_PONDERADA'].notna() & ((d['QTD_PONDERADA'] < minimo) | (d['QTD_PONDERADA'] > maximo))
+
+def semana_divergente(d):
+    # Há poucos rótulos "AAAA-SS" distintos: interpreta só os únicos e propaga pelos códigos do factorize
+    codigos, rotulos = pd.factorize(d['SEMANA NO ANO'])
+    partes = pd.Series(rotulos.astype(str)).str.extract(r'^(\d{4})-(\d{1,2})$').astype(float)
+    partes.loc[len(partes)] = np.nan  # código -1 (valor ausente) aponta para esta linha
+    ano = partes[0].to_numpy()[codigos]
+    semana = partes[1].to_numpy()[codigos]
+    data = d['DATA_DE_ENTREGA']
+    return d['SEMANA NO ANO'].notna() & data.notna() & ((ano != data.dt.year) | (semana != semana_esperada(data)))
+
+# (código, ação, descrição, máscara das linhas que FALHAM) — cada regra é uma única operação vetorizada
+REGRAS_QUALIDADE = [
+    ("QTD_INVALIDA", "rejeitar", "QTD ausente ou não numérica",
+     lambda d: d['QTD'].isna()),
+    ("QTD_NAO_POSITIVA", "rejeitar", "QTD menor ou igual a zero",
+     lambda d: d['QTD'] <= 0),
+    ("ANO_AUSENTE", "rejeitar", "ANO ENTREGA ausente ou não numérico",
+     lambda d: d['ANO_ENTREGA'].isna()),
+    ("RESPONSAVEL_AUSENTE", "rejeitar", "RESPONSAVEL não informado",
+     lambda d: d['RESPONSAVEL'].isna()),
+    ("EQUIPE_AUSENTE", "rejeitar", "EQUIPE não informada",
+     lambda d: d['EQUIPE'].isna()),
+    ("DATA_INVALIDA", "rejeitar", "DATA DE ENTREGA ausente ou fora do formato dd/mm/aaaa",
+     lambda d: d['DATA_DE_ENTREGA'].isna()),
+    ("MES_AUSENTE", "alertar", "MES ENTREGA ausente ou não numérico",
+     lambda d: d['MES_ENTREGA'].isna()),
+    ("MES_DIVERGENTE", "rejeitar", "MES ENTREGA diferente do mês da DATA DE ENTREGA",
+     lambda d: d['MES_ENTREGA'].notna() & d['DATA_DE_ENTREGA'].notna() & (d['MES_ENTREGA'] != d['DATA_DE_ENTREGA'].dt.month)),
+    ("ANO_DIVERGENTE", "rejeitar", "ANO ENTREGA diferente do ano da DATA DE ENTREGA",
+     lambda d: d['ANO_ENTREGA'].notna() & d['DATA_DE_ENTREGA'].notna() & (d['ANO_ENTREGA'] != d['DATA_DE_ENTREGA'].dt.year)),
+    ("PONDERADA_INVALIDA", "alertar", "QUANTIDADE PONDERADA ausente ou não numérica",
+     lambda d: d['QTD_PONDERADA'].isna()),
+    ("PONDERADA_FORA_FAIXA", "alertar", f"QTD_PONDERADA fora de {FATOR_PONDERACAO_MIN}×–{FATOR_PONDERACAO_MAX}× a QTD",
+     ponderada_fora_faixa),
+    ("SEMANA_AUSENTE", "alertar", "SEMANA NO ANO não informada",
+     lambda d: d['SEMANA NO ANO'].isna()),
+    ("SEMANA_DIVERGENTE", "alertar", "SEMANA NO ANO diferente da semana da DATA DE ENTREGA",
+     semana_divergente),
+]
+
+def validar_dados(d):
+    inicio = time.perf_counter()
+    falhas = pd.DataFrame({codigo: regra(d).to_numpy(dtype=bool) for codigo, _, _, regra in REGRAS_QUALIDADE}, index=d.index)
+    codigos_rejeicao = [codigo for codigo, acao, _, _ in REGRAS_QUALIDADE if acao == "rejeitar"]
+    rejeitadas = falhas[codigos_rejeicao].any(axis=1)
+    com_falha = falhas.any(axis=1)
+
+    # Códigos de motivo montados só para as linhas com falha (produto booleano × "CODIGO;")
+    quarentena = d.loc[com_falha].copy()
+    sufixos = pd.Series([f"{codigo};" for codigo in falhas.columns], index=falhas.columns)
+    quarentena['MOTIVOS'] = falhas.loc[com_falha].dot(sufixos).str.rstrip(';')
+    quarentena['ACAO'] = np.where(rejeitadas[com_falha], "REJEITADA", "ALERTA")
+
+    contagem = falhas.sum()
+    resumo = pd.DataFrame(
+        [(codigo, acao, descricao, int(contagem[codigo])) for codigo, acao, descricao, _ in REGRAS_QUALIDADE],
+        columns=['Código', 'Ação', 'Regra', 'Linhas']
+    )
+    duracao = time.perf_counter() - inicio
+    metricas = {
+        'linhas_validadas': len(d),
+        'linhas_rejeitadas': int(rejeitadas.sum()),
+        'linhas_alerta': int((com_falha & ~rejeitadas).sum()),
+        'tempo_validacao': duracao,
+        'linhas_por_segundo': len(d) / duracao if duracao > 0 else float('inf'),
+    }
+    return d.loc[~rejeitadas], quarentena, resumo, metricas
+
 # --- Carregar dados principais: OS (updated_dataframe.csv) ---
 try:
-    df = pd.read_csv(url_data, sep=',', on_bad_lines='warn', encoding='utf-8', low_memory=False)
+    inicio_ingestao = time.perf_counter()
+    # Linhas malformadas são descartadas pelo parser; os avisos são capturados para contabilizá-las
+    with warnings.catch_warnings(record=True) as avisos_leitura:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        df = pd.read_csv(url_data, sep=',', on_bad_lines='warn', encoding='utf-8', low_memory=False)
+    linhas_malformadas = sum(
+        str(aviso.message).count('Skipping line')
+        for aviso in avisos_leitura if issubclass(aviso.category, pd.errors.ParserWarning)
+    )
     df = df.rename(columns={
         'DATA DE ENTREGA': 'DATA_DE_ENTREGA',
         'ANO-MES entrega': 'MES_ANO',
@@ -36,14 +134,21 @@ try:
         'STATUS': 'STATUS'
     })
 
+    # Valores originais das colunas convertidas, para que a quarentena mostre o dado como veio no CSV
+    colunas_convertidas = ['QTD', 'QTD_PONDERADA', 'MES_ENTREGA', 'ANO_ENTREGA', 'DATA_DE_ENTREGA']
+    valores_originais = df[colunas_convertidas].copy()
+
     df['QTD'] = pd.to_numeric(df['QTD'], errors='coerce')
     df['QTD_PONDERADA'] = pd.to_numeric(df['QTD_PONDERADA'], errors='coerce')
     df['MES_ENTREGA'] = pd.to_numeric(df['MES_ENTREGA'], errors='coerce')
     df['ANO_ENTREGA'] = pd.to_numeric(df['ANO_ENTREGA'], errors='coerce')
     df['DATA_DE_ENTREGA'] = pd.to_datetime(df['DATA_DE_ENTREGA'], format='%d/%m/%Y', errors='coerce', dayfirst=True)
 
-    df = df.dropna(subset=['QTD', 'ANO_ENTREGA', 'RESPONSAVEL', 'EQUIPE', 'DATA_DE_ENTREGA'])
-    df = df[df['QTD'] > 0]
+    df, quarentena, resumo_qualidade, metricas_qualidade = validar_dados(df)
+    quarentena[colunas_convertidas] = valores_originais.loc[quarentena.index]
+    metricas_qualidade['linhas_malformadas'] = linhas_malformadas
+    metricas_qualidade['tempo_ingestao'] = time.perf_counter() - inicio_ingestao
+
     df['MES_ANO'] = df['DATA_DE_ENTREGA'].dt.to_period('M').astype(str)
     df['FAMILIA'] = df['FAMILIA'].str.upper()
 
@@ -152,6 +257,28 @@ st.title("🏭 Dashboard Científico de Produção")
 st.markdown("Análise avançada da linha de produção com métricas de desempenho, tendências e eficiência.")
 st.markdown("---")
 
+# --- Qualidade dos Dados ---
+with st.expander("🧪 Qualidade dos Dados (ingestão de updated_dataframe.csv)"):
+    col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+    col_q1.metric("Linhas Validadas", f"{metricas_qualidade['linhas_validadas']:,}")
+    col_q2.metric("Rejeitadas", f"{metricas_qualidade['linhas_rejeitadas']:,}")
+    col_q3.metric("Com Alerta", f"{metricas_qualidade['linhas_alerta']:,}")
+    col_q4.metric("Malformadas (descartadas)", f"{metricas_qualidade['linhas_malformadas']:,}")
+    st.dataframe(resumo_qualidade, use_container_width=True, hide_index=True)
+    st.caption(
+        f"⏱️ Validação: {metricas_qualidade['tempo_validacao'] * 1000:,.1f} ms "
+        f"({metricas_qualidade['linhas_por_segundo']:,.0f} linhas/s) · "
+        f"Ingestão total: {metricas_qualidade['tempo_ingestao']:,.2f} s"
+    )
+    if not quarentena.empty:
+        st.download_button(
+            "⬇️ Baixar quarentena (CSV)",
+            quarentena.to_csv(index=False).encode('utf-8'),
+            file_name=ARQUIVO_QUARENTENA,
+            mime="text/csv"
+        )
+st.markdown("---")
+
 # --- Métricas Gerais ---
 st.subheader("📈 Métricas Gerais")
 if not df_filtrado.empty: